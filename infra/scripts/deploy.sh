@@ -176,6 +176,9 @@ deploy_terraform() {
     ECR_REPOSITORY_URL=$(terraform output -raw ecr_repository_url)
     OPENSEARCH_ENDPOINT=$(terraform output -raw opensearch_collection_endpoint)
     API_GATEWAY_URL=$(terraform output -raw api_gateway_query_endpoint)
+    # Index mapping must match what the Lambdas were configured with
+    VECTOR_DATA_TYPE=$(terraform output -raw vector_data_type 2>/dev/null || echo "float")
+    EMBED_DIMENSIONS=$(terraform output -raw embed_dimensions 2>/dev/null || echo "1024")
     # Also try canonical output if present (no fail if missing)
     if command -v terraform >/dev/null 2>&1; then
         if terraform output -raw http_api_ask_endpoint >/dev/null 2>&1; then
@@ -339,6 +342,9 @@ from requests_aws4auth import AWS4Auth
 OPENSEARCH_ENDPOINT = "$OPENSEARCH_ENDPOINT"
 AWS_REGION = "$AWS_REGION"
 INDEX_NAME = "kb_chunks"
+# Mirrors _embedding_mapping() in src/python/doc_ingestor.py
+VECTOR_DATA_TYPE = "${VECTOR_DATA_TYPE:-float}".lower()
+EMBED_DIMENSIONS = int("${EMBED_DIMENSIONS:-1024}")
 
 # Setup OpenSearch client
 session = boto3.Session()
@@ -353,6 +359,47 @@ os_client = OpenSearch(
     connection_class=RequestsHttpConnection
 )
 
+if VECTOR_DATA_TYPE == "byte":
+    embedding_mapping = {
+        "type": "knn_vector",
+        "dimension": EMBED_DIMENSIONS,
+        "data_type": "byte",
+        "space_type": "cosinesimil",
+        "method": {
+            "name": "hnsw",
+            "engine": "lucene",
+            "parameters": {"m": 16, "ef_construction": 100}
+        }
+    }
+elif VECTOR_DATA_TYPE == "fp16":
+    embedding_mapping = {
+        "type": "knn_vector",
+        "dimension": EMBED_DIMENSIONS,
+        "space_type": "cosinesimil",
+        "method": {
+            "name": "hnsw",
+            "engine": "faiss",
+            "parameters": {
+                "m": 16,
+                "ef_construction": 100,
+                "encoder": {"name": "sq", "parameters": {"type": "fp16"}}
+            }
+        }
+    }
+else:
+    embedding_mapping = {
+        "type": "knn_vector",
+        "dimension": EMBED_DIMENSIONS,
+        "space_type": "cosinesimil",
+        "mode": "on_disk",
+        "compression_level": "16x",
+        "method": {
+            "name": "hnsw",
+            "engine": "faiss",
+            "parameters": {"m": 16, "ef_construction": 100}
+        }
+    }
+
 # Index mapping from the config file
 index_mapping = {
     "settings": {
@@ -360,21 +407,7 @@ index_mapping = {
     },
     "mappings": {
         "properties": {
-            "embedding": {
-                "type": "knn_vector",
-                "dimension": 1024,
-                "space_type": "cosinesimil",
-                "mode": "on_disk",
-                "compression_level": "16x",
-                "method": {
-                    "name": "hnsw",
-                    "engine": "faiss",
-                    "parameters": {
-                        "m": 16,
-                        "ef_construction": 100
-                    }
-                }
-            },
+            "embedding": embedding_mapping,
             "chunk_text": {"type": "text"},
             "doc_id": {"type": "keyword"},
             "chunk_id": {"type": "integer"},
@@ -398,7 +431,7 @@ try:
     else:
         # Create the index
         os_client.indices.create(index=INDEX_NAME, body=index_mapping)
-        print(f"Successfully created index {INDEX_NAME}")
+        print(f"Successfully created index {INDEX_NAME} (vector_data_type={VECTOR_DATA_TYPE}, dimension={EMBED_DIMENSIONS})")
 except Exception as e:
     print(f"Error creating index: {e}")
     exit(1)
@@ -21,3 +21,27 @@ resource "aws_dynamodb_table" "knowledge_base" {
     Project     = "aws-knowledge-assistant"
   }
 }
+
+# DynamoDB Table caching Bedrock embeddings by content hash
+resource "aws_dynamodb_table" "embed_cache" {
+  name         = var.embed_cache_table_name
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "pk"
+
+  attribute {
+    name = "pk"
+    type = "S"
+  }
+
+  # Lambdas write expires_at (epoch seconds); DynamoDB deletes expired items
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Name        = "Embedding Cache"
+    Environment = "production"
+    Project     = "aws-knowledge-assistant"
+  }
+}
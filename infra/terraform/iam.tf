@@ -59,6 +59,14 @@ resource "aws_iam_policy" "doc_ingestor_policy" {
           "bedrock:InvokeModel"
         ]
         Resource = "arn:aws:bedrock:${var.aws_region}::foundation-model/amazon.titan-embed-text-v2:0"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem"
+        ]
+        Resource = aws_dynamodb_table.embed_cache.arn
       }
     ]
   })
@@ -128,7 +136,8 @@ resource "aws_iam_policy" "query_processor_policy" {
       {
         Effect = "Allow"
         Action = [
-          "bedrock:InvokeModel"
+          "bedrock:InvokeModel",
+          "bedrock:InvokeModelWithResponseStream"
         ]
         Resource = [
           "arn:aws:bedrock:${var.aws_region}::foundation-model/anthropic.claude-3-5-sonnet-20241022-v2:0",
@@ -138,12 +147,21 @@ resource "aws_iam_policy" "query_processor_policy" {
       {
         Effect = "Allow"
         Action = [
-          "bedrock:InvokeModel"
+          "bedrock:InvokeModel",
+          "bedrock:InvokeModelWithResponseStream"
         ]
         Resource = [
           "arn:aws:bedrock:${var.aws_region}:*:inference-profile/*",
           "arn:aws:bedrock:*:*:inference-profile/*"
         ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem"
+        ]
+        Resource = aws_dynamodb_table.embed_cache.arn
       }
     ]
   })
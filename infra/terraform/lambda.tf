@@ -14,6 +14,11 @@ resource "aws_lambda_function" "doc_ingestor" {
       OPENSEARCH_ENDPOINT = aws_opensearchserverless_collection.kb_vector.collection_endpoint
       OPENSEARCH_INDEX    = "kb_chunks"
       EMBED_MODEL_ID      = "amazon.titan-embed-text-v2:0"
+      EMBED_CONCURRENCY   = "8"
+      RECORD_CONCURRENCY  = "4"
+      EMBED_CACHE_TABLE   = aws_dynamodb_table.embed_cache.name
+      VECTOR_DATA_TYPE    = var.vector_data_type
+      EMBED_DIMENSIONS    = tostring(var.embed_dimensions)
     }
   }
 
@@ -47,6 +52,12 @@ resource "aws_lambda_function" "query_processor" {
       EMBED_MODEL_ID      = "amazon.titan-embed-text-v2:0"
       GEN_MODEL_ID        = "anthropic.claude-3-5-sonnet-20241022-v2:0"
       GEN_INFERENCE_PROFILE_ID = var.gen_inference_profile_id
+      GEN_LATENCY_OPTIMIZED    = var.gen_latency_optimized ? "true" : "false"
+      NEURAL_MODEL_ID          = var.neural_model_id
+      ANSWER_CACHE_ENABLED     = "true"
+      EMBED_CACHE_TABLE   = aws_dynamodb_table.embed_cache.name
+      VECTOR_DATA_TYPE    = var.vector_data_type
+      EMBED_DIMENSIONS    = tostring(var.embed_dimensions)
     }
   }
 
@@ -96,7 +96,11 @@ resource "aws_opensearchserverless_collection" "kb_vector" {
 # using the OpenSearch API, not through Terraform. The index configuration below should be
 # implemented in your Python application code when initializing the vector store.
 #
-# Index Configuration Template (to be used in application code):
+# Index Configuration Template (to be used in application code). This is the
+# default vector_data_type = "float" mapping; "byte" and "fp16" change the
+# embedding field as in _embedding_mapping() (src/python/doc_ingestor.py),
+# and deploy.sh creates whichever one is configured, with "dimension" set to
+# var.embed_dimensions:
 # {
 #   "mappings": {
 #     "properties": {
@@ -43,6 +43,16 @@ output "opensearch_collection_endpoint" {
   value       = aws_opensearchserverless_collection.kb_vector.collection_endpoint
 }
 
+output "vector_data_type" {
+  description = "knn_vector storage type the Lambdas expect; used by deploy.sh to create the index"
+  value       = var.vector_data_type
+}
+
+output "embed_dimensions" {
+  description = "Embedding dimension the Lambdas request; used by deploy.sh to create the index"
+  value       = var.embed_dimensions
+}
+
 output "opensearch_dashboard_url" {
   description = "Dashboard URL for the OpenSearch Serverless collection"
   value       = aws_opensearchserverless_collection.kb_vector.dashboard_endpoint
@@ -16,6 +16,12 @@ variable "table_name" {
   default     = "KnowledgeBase"
 }
 
+variable "embed_cache_table_name" {
+  description = "Name of the DynamoDB table caching embeddings by content hash"
+  type        = string
+  default     = "embed_cache"
+}
+
 variable "collection_name" {
   description = "Name of the OpenSearch Serverless collection"
   type        = string
@@ -27,3 +33,27 @@ variable "gen_inference_profile_id" {
   type        = string
   default     = ""
 }
+
+variable "gen_latency_optimized" {
+  description = "Request Bedrock latency-optimized inference for answer generation. Only supported for some models/regions."
+  type        = bool
+  default     = false
+}
+
+variable "vector_data_type" {
+  description = "knn_vector storage for embeddings. \"float\" (default) is on_disk with 16x compression: the least memory, plus a rescoring pass on disk. \"fp16\" (faiss scalar quantization, ~8x the memory) and \"byte\" (int8, ~4x the memory) keep the whole graph in memory, skipping that rescoring step in exchange for more memory. deploy.sh creates the index with the matching mapping; changing it later requires recreating the index and re-ingesting."
+  type        = string
+  default     = "float"
+}
+
+variable "embed_dimensions" {
+  description = "Titan v2 embedding dimensions (256, 512 or 1024). deploy.sh creates the index with this dimension; changing it later requires recreating the index and re-ingesting."
+  type        = number
+  default     = 1024
+}
+
+variable "neural_model_id" {
+  description = "Optional OpenSearch ML Commons model ID (Bedrock connector) used for server-side query embedding with `neural` queries. Leave empty to embed queries in the Lambda. Ignored when vector_data_type is \"byte\", since the connector returns float vectors that do not match the int8-quantized index."
+  type        = string
+  default     = ""
+}
@@ -1,14 +1,23 @@
 """Document ingestion Lambda: chunks text, embeds via Bedrock, indexes to OpenSearch."""
 
+import base64
+import codecs
+import functools
 import hashlib
-import json
 import logging
 import os
-import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
+import numpy as np
+import orjson
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
-from opensearchpy import OpenSearch, RequestsHttpConnection
+from opensearchpy import AWSV4SignerAuth, OpenSearch, RequestsHttpConnection, helpers
+from opensearchpy.exceptions import SerializationError
+from opensearchpy.serializer import JSONSerializer
 
 # Configure logging (buffered per invocation; see handler below)
 log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
@@ -25,49 +34,208 @@ class BufferedLogHandler(logging.Handler):
         except Exception:
             pass
 
+    def clear(self):
+        self._records.clear()
+
     def get_value(self):
         return "\n".join(self._records)
 
 logger = logging.getLogger(__name__)
 
+# One buffer per container, reset at the start of each invocation
+buf_handler = BufferedLogHandler()
+buf_handler.setLevel(getattr(logging, log_level, logging.INFO))
+
+def _install_log_buffer():
+    """Route root logging into buf_handler and clear the previous invocation's records."""
+    root_logger = logging.getLogger()
+    if root_logger.handlers != [buf_handler]:
+        for h in list(root_logger.handlers):
+            root_logger.removeHandler(h)
+        root_logger.addHandler(buf_handler)
+        root_logger.setLevel(getattr(logging, log_level, logging.INFO))
+    buf_handler.clear()
+
 BEDROCK_REGION = os.environ.get("BEDROCK_REGION", "us-east-1")
 EMBED_MODEL_ID = os.environ.get(
     "EMBED_MODEL_ID", "amazon.titan-embed-text-v2:0"
 )
 # e.g., https://<id>.<region>.aoss.amazonaws.com
 OPENSEARCH_ENDPOINT = os.environ["OPENSEARCH_ENDPOINT"]
+OPENSEARCH_HOST = OPENSEARCH_ENDPOINT.replace("https://", "")
 OPENSEARCH_INDEX = os.environ.get("OPENSEARCH_INDEX", "kb_chunks")
+OPENSEARCH_POOL_MAXSIZE = int(os.environ.get("OPENSEARCH_POOL_MAXSIZE", "32"))
+# Concurrent Bedrock embedding calls per document; keep modest to stay under
+# the account's Titan TPS quota.
+EMBED_CONCURRENCY = max(1, int(os.environ.get("EMBED_CONCURRENCY", "8")))
+# S3 records processed in parallel per invocation
+RECORD_CONCURRENCY = max(1, int(os.environ.get("RECORD_CONCURRENCY", "4")))
+# Optional DynamoDB table caching embeddings by content hash; unset disables it
+EMBED_CACHE_TABLE = os.environ.get("EMBED_CACHE_TABLE")
+# Cache entries expire (DynamoDB TTL on expires_at) after this many seconds
+EMBED_CACHE_TTL_SECONDS = int(os.environ.get("EMBED_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# "float" (default), "fp16" (faiss scalar quantization) or "byte" (int8)
+VECTOR_DATA_TYPE = os.environ.get("VECTOR_DATA_TYPE", "float").lower()
+# Embedding output size; must match the index mapping. Titan v2 is asked for
+# this size (256, 512 or 1024); other models must be configured to match
+# their native size.
+EMBED_DIMENSIONS = int(os.environ.get("EMBED_DIMENSIONS", "1024"))
+# Only Titan Text Embeddings v2 accepts "dimensions"/"normalize" in the body
+EMBED_ACCEPTS_DIMENSIONS = "titan-embed-text-v2" in EMBED_MODEL_ID
+if EMBED_ACCEPTS_DIMENSIONS and EMBED_DIMENSIONS not in (256, 512, 1024):
+    raise ValueError(
+        f"EMBED_DIMENSIONS must be 256, 512 or 1024 for {EMBED_MODEL_ID}, got {EMBED_DIMENSIONS}"
+    )
 
-s3 = boto3.client("s3")
-bedrock = boto3.client("bedrock-runtime", region_name=BEDROCK_REGION)
-
-# For serverless auth, use SigV4 via boto credentials; opensearch-py supports
-# that via AWSV4SignerAuth in aws-requests-auth.
-from requests_aws4auth import AWS4Auth
-
-session = boto3.Session()
-credentials = session.get_credentials()
-awsauth = AWS4Auth(
-    credentials.access_key,
-    credentials.secret_key,
-    BEDROCK_REGION,
-    "aoss",
-    session_token=credentials.token,
-)
+# Clients are built on first use so cold starts don't pay for credential
+# lookups and client setup on paths that never need them. The lock keeps
+# boto3's non-thread-safe client construction off the worker threads.
+_CLIENT_LOCK = threading.Lock()
 
-os_client = OpenSearch(
-    hosts=[{"host": OPENSEARCH_ENDPOINT.replace("https://", ""), "port": 443}],
-    http_auth=awsauth,
-    use_ssl=True,
-    verify_certs=True,
-    connection_class=RequestsHttpConnection,
-)
+@functools.lru_cache(maxsize=1)
+def _s3():
+    with _CLIENT_LOCK:
+        return boto3.client("s3")
+
+@functools.lru_cache(maxsize=1)
+def _dynamodb():
+    with _CLIENT_LOCK:
+        return boto3.client("dynamodb")
+
+@functools.lru_cache(maxsize=1)
+def _bedrock():
+    # Standard retry mode backs off with jittered exponential delay on
+    # ThrottlingException, which the parallel embed path can trigger.
+    with _CLIENT_LOCK:
+        return boto3.client(
+            "bedrock-runtime",
+            region_name=BEDROCK_REGION,
+            config=BotoConfig(
+                connect_timeout=3,
+                read_timeout=25,
+                retries={"max_attempts": 5, "mode": "standard"},
+                max_pool_connections=max(10, EMBED_CONCURRENCY * RECORD_CONCURRENCY),
+            ),
+        )
+
+@functools.lru_cache(maxsize=1)
+def _awsauth():
+    # SigV4 for AOSS. AWSV4SignerAuth keeps the session's refreshable
+    # credentials and signs each request with their current frozen keys, so
+    # long-lived warm containers never sign with expired tokens.
+    with _CLIENT_LOCK:
+        credentials = boto3.Session().get_credentials()
+        return AWSV4SignerAuth(credentials, BEDROCK_REGION, "aoss")
+
+class OrjsonSerializer(JSONSerializer):
+    """opensearch-py serializer backed by orjson (used for _bulk and search bodies)."""
+
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            raise SerializationError(s, e)
+
+    def dumps(self, data):
+        if isinstance(data, str):
+            return data
+        try:
+            return orjson.dumps(
+                data, default=self.default, option=orjson.OPT_SERIALIZE_NUMPY
+            ).decode("utf-8")
+        except (TypeError, orjson.JSONEncodeError) as e:
+            raise SerializationError(data, e)
+
+@functools.lru_cache(maxsize=1)
+def _os_client():
+    return OpenSearch(
+        hosts=[{"host": OPENSEARCH_HOST, "port": 443}],
+        http_auth=_awsauth(),
+        use_ssl=True,
+        verify_certs=True,
+        connection_class=RequestsHttpConnection,
+        serializer=OrjsonSerializer(),
+        # Keep-alive pool shared across invocations of a warm container; sized so
+        # concurrent writers don't wait on connection establishment.
+        pool_maxsize=OPENSEARCH_POOL_MAXSIZE,
+        timeout=30,
+        # gzip request bodies; vector-heavy _bulk/_search JSON compresses well
+        http_compress=True,
+    )
+
+def _embedding_mapping():
+    """knn_vector mapping for the embedding field, per VECTOR_DATA_TYPE."""
+    if VECTOR_DATA_TYPE == "byte":
+        # int8 vectors (4x vs fp32): smaller request payloads and no on-disk
+        # rescoring, but ~4x the graph memory of the default on_disk/16x
+        # mapping, which byte vectors can't use.
+        return {
+            "type": "knn_vector",
+            "dimension": EMBED_DIMENSIONS,
+            "data_type": "byte",
+            "space_type": "cosinesimil",
+            "method": {
+                "name": "hnsw",
+                "engine": "lucene",
+                "parameters": {
+                    "m": 16,
+                    "ef_construction": 100
+                }
+            }
+        }
+    if VECTOR_DATA_TYPE == "fp16":
+        # faiss fp16 scalar quantization (2x vs fp32), fully in memory: no
+        # on-disk rescoring step, but ~8x the graph memory of the default
+        # on_disk/16x mapping. Clients keep sending plain floats.
+        return {
+            "type": "knn_vector",
+            "dimension": EMBED_DIMENSIONS,
+            "space_type": "cosinesimil",
+            "method": {
+                "name": "hnsw",
+                "engine": "faiss",
+                "parameters": {
+                    "m": 16,
+                    "ef_construction": 100,
+                    "encoder": {
+                        "name": "sq",
+                        "parameters": {"type": "fp16"}
+                    }
+                }
+            }
+        }
+    return {
+        "type": "knn_vector",
+        "dimension": EMBED_DIMENSIONS,
+        "space_type": "cosinesimil",
+        "mode": "on_disk",
+        "compression_level": "16x",
+        "method": {
+            "name": "hnsw",
+            "engine": "faiss",
+            "parameters": {
+                "m": 16,
+                "ef_construction": 100
+            }
+        }
+    }
+
+def _quantize_int8(vec):
+    """Scale unit-normalized embedding(s) into the int8 range (1-D or 2-D)."""
+    return np.clip(np.rint(np.asarray(vec, dtype=np.float32) * 127), -128, 127).astype(np.int8)
+
+# Set once the index is known to exist so warm invocations skip the probe
+_INDEX_READY = False
 
 def ensure_index_exists():
-    """Create the vector index if it doesn't exist."""
+    """Create the vector index if it doesn't exist (once per container)."""
+    global _INDEX_READY
+    if _INDEX_READY:
+        return
     try:
-        if os_client.indices.exists(index=OPENSEARCH_INDEX):
+        if _os_client().indices.exists(index=OPENSEARCH_INDEX):
             logger.info("Index %s already exists", OPENSEARCH_INDEX)
+            _INDEX_READY = True
             return
         
         logger.info("Creating index %s", OPENSEARCH_INDEX)
@@ -77,21 +245,7 @@ def ensure_index_exists():
             },
             "mappings": {
                 "properties": {
-                    "embedding": {
-                        "type": "knn_vector",
-                        "dimension": 1024,
-                        "space_type": "cosinesimil",
-                        "mode": "on_disk",
-                        "compression_level": "16x",
-                        "method": {
-                            "name": "hnsw",
-                            "engine": "faiss",
-                            "parameters": {
-                                "m": 16,
-                                "ef_construction": 100
-                            }
-                        }
-                    },
+                    "embedding": _embedding_mapping(),
                     "chunk_text": {"type": "text"},
                     "doc_id": {"type": "keyword"},
                     "chunk_id": {"type": "integer"},
@@ -108,27 +262,84 @@ def ensure_index_exists():
             }
         }
         
-        os_client.indices.create(index=OPENSEARCH_INDEX, body=index_config)
+        _os_client().indices.create(index=OPENSEARCH_INDEX, body=index_config)
         logger.info("Successfully created index %s", OPENSEARCH_INDEX)
+        _INDEX_READY = True
         
     except Exception as e:
         logger.error("Error ensuring index exists: %s", str(e))
         # Don't raise the error - the Lambda should continue even if index creation
         # fails as it might already exist or be created by another instance
 
-def chunk_text(text, max_len=1200):
-    """Simple character-based chunker."""
-    chunks = textwrap.wrap(text, max_len)
+def _sliding_windows(pieces, max_chars, overlap):
+    """Yield overlapping chunks from an iterable of text pieces.
+
+    Runs in linear time: windows are tracked by offset into the buffer, and
+    the consumed prefix is only dropped when more text is appended. Each
+    window end is pulled back to the last whitespace in its second half, when
+    there is one, so words aren't split across chunks.
+    """
+    if overlap >= max_chars:
+        raise ValueError("overlap must be smaller than max_chars")
+    pieces = iter(pieces)
+    buf = ""
+    start = 0
+    exhausted = False
+    while True:
+        # Buffer past the window so we know whether more text follows it
+        if not exhausted and len(buf) - start <= max_chars:
+            buf = buf[start:]
+            start = 0
+            while not exhausted and len(buf) <= max_chars:
+                piece = next(pieces, None)
+                if piece is None:
+                    exhausted = True
+                else:
+                    buf += piece
+        n = len(buf)
+        if start >= n:
+            return
+        end = min(start + max_chars, n)
+        if end < n:
+            cut = buf.rfind(" ", start + max_chars // 2, end)
+            if cut == -1:
+                cut = buf.rfind("\n", start + max_chars // 2, end)
+            if cut != -1:
+                end = cut
+        chunk = buf[start:end].strip()
+        if chunk:
+            yield chunk
+        if end >= n:
+            return
+        start = max(end - overlap, start + 1)
+
+def chunk_text(text, max_chars=1800, overlap=200):
+    """Linear sliding-window chunker over characters.
+
+    Consecutive chunks share `overlap` characters.
+    """
+    chunks = list(_sliding_windows([text], max_chars, overlap))
     logger.debug(
-        "Chunked text: input length=%d, chunks=%d, max_len=%d",
+        "Chunked text: input length=%d, chunks=%d, max_chars=%d, overlap=%d",
         len(text),
         len(chunks),
-        max_len,
+        max_chars,
+        overlap,
     )
     return chunks
 
+def iter_chunks(body_stream, max_chars=1800, overlap=200, read_size=65536):
+    """Chunk a UTF-8 byte stream (e.g. an S3 StreamingBody) incrementally.
+
+    Produces the same chunks as chunk_text() on the decoded text without ever
+    holding the whole document in memory.
+    """
+    reader = codecs.getreader("utf-8")(body_stream, errors="ignore")
+    pieces = iter(lambda: reader.read(read_size), "")
+    yield from _sliding_windows(pieces, max_chars, overlap)
+
 def embed(text, dimensions=None, normalize=None, model_id=None):
-    """Return embedding (list of floats) for text.
+    """Return embedding (float32 NumPy array) for text.
 
     dimensions: Optional override for output dims (e.g., 256/512/1024).
     normalize: Optional normalization flag.
@@ -154,15 +365,15 @@ def embed(text, dimensions=None, normalize=None, model_id=None):
     if normalize is not None:
         native_request["normalize"] = bool(normalize)
 
-    body = json.dumps(native_request)
+    body = orjson.dumps(native_request)
 
     try:
         # include contentType/accept if you want explicit headers
-        resp = bedrock.invoke_model(modelId=model_id, body=body)
+        resp = _bedrock().invoke_model(modelId=model_id, body=body)
         raw = resp["body"].read()
-        payload = json.loads(raw)
+        payload = orjson.loads(raw)
         if "embedding" in payload:
-            embedding = payload["embedding"]
+            embedding = np.asarray(payload["embedding"], dtype=np.float32)
             logger.info(
                 "Successfully generated embedding: dimension=%d", len(embedding)
             )
@@ -172,7 +383,7 @@ def embed(text, dimensions=None, normalize=None, model_id=None):
             # try to find embedding in outputs
             for output_item in payload["outputs"]:
                 if isinstance(output_item, dict) and "embedding" in output_item:
-                    embedding = output_item["embedding"]
+                    embedding = np.asarray(output_item["embedding"], dtype=np.float32)
                     logger.info(
                         (
                             "Successfully generated embedding from outputs: "
@@ -183,7 +394,7 @@ def embed(text, dimensions=None, normalize=None, model_id=None):
                     return embedding
         error_msg = (
             "No 'embedding' found in model response: "
-            + json.dumps(payload)[:1000]
+            + orjson.dumps(payload).decode()[:1000]
         )
         logger.error(error_msg)
         raise RuntimeError(error_msg)
@@ -196,40 +407,269 @@ def embed(text, dimensions=None, normalize=None, model_id=None):
         logger.error("Embed failed: %s - %s", type(e).__name__, str(e))
         raise
 
+def _embed_cache_key(text, model_id, dimensions=None, normalize=None):
+    """Content-addressed cache key for an embedding request."""
+    raw = f"{model_id}\0{dimensions}\0{normalize}\0{text}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+def _pack_vec(vec):
+    return base64.b64encode(np.asarray(vec, dtype=np.float32).tobytes()).decode("ascii")
+
+def _unpack_vec(vec_b64):
+    return np.frombuffer(base64.b64decode(vec_b64), dtype=np.float32)
+
+def _cache_get_many(keys):
+    """Return {key: vec} for cached embeddings; misses are simply absent."""
+    found = {}
+    keys = list(dict.fromkeys(keys))
+    try:
+        # BatchGetItem accepts at most 100 keys per request
+        for start in range(0, len(keys), 100):
+            batch = keys[start:start + 100]
+            resp = _dynamodb().batch_get_item(
+                RequestItems={
+                    EMBED_CACHE_TABLE: {
+                        "Keys": [{"pk": {"S": k}} for k in batch],
+                        "ProjectionExpression": "pk, vec_b64, expires_at",
+                    }
+                }
+            )
+            now = int(time.time())
+            for item in resp.get("Responses", {}).get(EMBED_CACHE_TABLE, []):
+                # TTL deletion is lazy; treat expired items as misses
+                if "expires_at" in item and int(item["expires_at"]["N"]) <= now:
+                    continue
+                found[item["pk"]["S"]] = _unpack_vec(item["vec_b64"]["S"])
+            # Unprocessed keys are treated as misses and re-embedded
+    except Exception as e:
+        logger.warning("Embedding cache lookup failed: %s - %s", type(e).__name__, str(e))
+    return found
+
+def _cache_put_many(items):
+    """Store {key: vec} in the embedding cache; failures are non-fatal."""
+    entries = list(items.items())
+    expires_at = str(int(time.time()) + EMBED_CACHE_TTL_SECONDS)
+    try:
+        # BatchWriteItem accepts at most 25 items per request
+        for start in range(0, len(entries), 25):
+            batch = entries[start:start + 25]
+            _dynamodb().batch_write_item(
+                RequestItems={
+                    EMBED_CACHE_TABLE: [
+                        {
+                            "PutRequest": {
+                                "Item": {
+                                    "pk": {"S": k},
+                                    "vec_b64": {"S": _pack_vec(v)},
+                                    "dim": {"N": str(len(v))},
+                                    "expires_at": {"N": expires_at},
+                                }
+                            }
+                        }
+                        for k, v in batch
+                    ]
+                }
+            )
+    except Exception as e:
+        logger.warning("Embedding cache write failed: %s - %s", type(e).__name__, str(e))
+
+def embed_batch(texts, dimensions=None, normalize=None, model_id=None, max_workers=None):
+    """Return embeddings for texts, in the same order as the input.
+
+    Titan only accepts a single inputText per request, so each text still gets
+    its own invoke_model call; the calls share the module-level client and are
+    fanned out over a thread pool since the work is network-bound. When
+    EMBED_CACHE_TABLE is set, cached vectors are reused and duplicate texts are
+    embedded only once.
+    """
+    vecs = [None] * len(texts)
+    if not texts:
+        return vecs
+
+    model_id = model_id or EMBED_MODEL_ID
+    keys = [
+        _embed_cache_key(t, model_id, dimensions=dimensions, normalize=normalize)
+        for t in texts
+    ]
+    cached = _cache_get_many(keys) if EMBED_CACHE_TABLE else {}
+
+    # One Bedrock call per distinct uncached text
+    pending = {}
+    for i, key in enumerate(keys):
+        if key in cached:
+            vecs[i] = cached[key]
+        else:
+            pending.setdefault(key, i)
+
+    fresh = {}
+
+    def _embed_one(key):
+        fresh[key] = embed(
+            texts[pending[key]],
+            dimensions=dimensions,
+            normalize=normalize,
+            model_id=model_id,
+        )
+
+    workers = max(1, min(max_workers or EMBED_CONCURRENCY, len(pending) or 1))
+    logger.info(
+        "Embedding batch: texts=%d, cache_hits=%d, to_embed=%d, max_workers=%d",
+        len(texts),
+        len(texts) - sum(1 for k in keys if k not in cached),
+        len(pending),
+        workers,
+    )
+    if pending:
+        _bedrock()  # build the client once, before fanning out
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            # list() re-raises the first worker exception, if any
+            list(ex.map(_embed_one, list(pending)))
+        if EMBED_CACHE_TABLE:
+            _cache_put_many(fresh)
+
+    for i, key in enumerate(keys):
+        if vecs[i] is None:
+            vecs[i] = fresh[key]
+    return vecs
+
+def _index_vector(vec):
+    """Convert an embedding into the representation the index stores."""
+    if VECTOR_DATA_TYPE == "byte":
+        return _quantize_int8(vec)
+    return vec
+
 def index_chunk(doc_id, chunk_id, chunk_text_value, vec, meta):
     """Index a single chunk into OpenSearch."""
-    logger.debug(
-        (
-            "Indexing chunk: doc_id=%s, chunk_id=%s, text_length=%d, "
-            "embedding_dim=%d"
-        ),
-        doc_id,
-        str(chunk_id),
-        len(chunk_text_value),
-        len(vec),
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            (
+                "Indexing chunk: doc_id=%s, chunk_id=%s, text_length=%d, "
+                "embedding_dim=%d"
+            ),
+            doc_id,
+            str(chunk_id),
+            len(chunk_text_value),
+            len(vec),
+        )
     body = {
         "doc_id": doc_id,
         "chunk_id": chunk_id,
         "chunk_text": chunk_text_value,
-        "embedding": vec,
+        "embedding": _index_vector(vec),
         **meta,
     }
     # doc_id and chunk_id are in the body, so we can query by those fields
-    os_client.index(index=OPENSEARCH_INDEX, body=body)
+    _os_client().index(index=OPENSEARCH_INDEX, body=body)
     logger.info(
         "Successfully indexed chunk: doc_id=%s, chunk_id=%s", doc_id, str(chunk_id)
     )
 
+def index_chunks_bulk(doc_id, chunks, vecs, meta):
+    """Index all chunks of a document into OpenSearch with one _bulk request.
+
+    Any request failure or rejected item is raised so the S3 event retries.
+    """
+    # Convert the whole document's vectors in one vectorized op
+    index_vecs = _index_vector(np.stack(vecs))
+    actions = [
+        {
+            "_index": OPENSEARCH_INDEX,
+            "_source": {
+                "doc_id": doc_id,
+                "chunk_id": i,
+                "chunk_text": c,
+                "embedding": v,
+                **meta,
+            },
+        }
+        for i, (c, v) in enumerate(zip(chunks, index_vecs))
+    ]
+    logger.info(
+        "Bulk indexing chunks: doc_id=%s, actions=%d", doc_id, len(actions)
+    )
+    # Transport/connection errors propagate: a failed or timed-out _bulk may
+    # still have been applied (and retried by the transport), and actions
+    # carry no _id, so re-sending chunks here could duplicate them. The S3
+    # event retry handles these failures instead.
+    success = 0
+    errors = []
+    for ok, item in helpers.streaming_bulk(
+        _os_client(),
+        actions,
+        chunk_size=500,
+        request_timeout=60,
+        raise_on_error=False,
+    ):
+        if ok:
+            success += 1
+        else:
+            errors.append(item)
+
+    if errors:
+        error_msg = (
+            f"Bulk indexing had {len(errors)} failed actions for doc_id={doc_id}: "
+            + orjson.dumps(errors[:3], default=str).decode()[:1000]
+        )
+        logger.error(error_msg)
+        raise RuntimeError(error_msg)
+
+    logger.info(
+        "Successfully bulk indexed chunks: doc_id=%s, indexed=%d", doc_id, success
+    )
+    return success
+
+def process_record(record, record_idx=0, record_count=1):
+    """Load, chunk, embed and index the S3 object referenced by one record."""
+    bucket = record["s3"]["bucket"]["name"]
+    key = record["s3"]["object"]["key"]
+    logger.info(
+        "Processing S3 record %d/%d: bucket=%s, key=%s",
+        record_idx + 1,
+        record_count,
+        bucket,
+        key,
+    )
+
+    obj = _s3().get_object(Bucket=bucket, Key=key)
+    logger.info(
+        "Document opened: key=%s, content_length=%s bytes",
+        key,
+        obj.get("ContentLength"),
+    )
+
+    doc_id = hashlib.md5(key.encode()).hexdigest()
+    logger.debug("Generated doc_id: %s for key: %s", doc_id, key)
+    meta = {"source": "s3", "s3_key": key}
+
+    # Decode and chunk while streaming, so the full document text is never
+    # resident alongside its chunks
+    chunks = list(iter_chunks(obj["Body"]))
+    logger.info(
+        "Chunking complete: doc_id=%s, total_chunks=%d", doc_id, len(chunks)
+    )
+
+    embed_kwargs = (
+        {"dimensions": EMBED_DIMENSIONS, "normalize": True}
+        if EMBED_ACCEPTS_DIMENSIONS
+        else {}
+    )
+    vecs = embed_batch(chunks, **embed_kwargs)
+    logger.info(
+        "Embedding complete: doc_id=%s, embeddings=%d", doc_id, len(vecs)
+    )
+
+    if chunks:
+        index_chunks_bulk(doc_id, chunks, vecs, meta)
+
+    logger.info(
+        "Successfully processed document: doc_id=%s, chunks_indexed=%d",
+        doc_id,
+        len(chunks),
+    )
+
 def handler(event, context):
     """AWS Lambda handler for ingesting S3 documents into OpenSearch."""
-    # Install buffered logging per invocation
-    root_logger = logging.getLogger()
-    for h in list(root_logger.handlers):
-        root_logger.removeHandler(h)
-    buf_handler = BufferedLogHandler()
-    root_logger.addHandler(buf_handler)
-    root_logger.setLevel(getattr(logging, log_level, logging.INFO))
+    _install_log_buffer()
 
     logger.info(
         "Lambda invocation started: record_count=%d",
@@ -240,44 +680,23 @@ def handler(event, context):
         # Ensure the index exists before processing documents
         ensure_index_exists()
 
-        # Expect event from S3 put trigger
+        # Expect event from S3 put trigger; records are independent, so they
+        # are processed concurrently (each one fans out its own embed calls)
         records = event.get("Records", [])
-        for record_idx, record in enumerate(records):
-            bucket = record["s3"]["bucket"]["name"]
-            key = record["s3"]["object"]["key"]
-            logger.info(
-                "Processing S3 record %d/%d: bucket=%s, key=%s",
-                record_idx + 1,
-                len(records),
-                bucket,
-                key,
-            )
-
-            obj = s3.get_object(Bucket=bucket, Key=key)
-            text = obj["Body"].read().decode("utf-8", errors="ignore")
-            logger.info("Document loaded: key=%s, text_size=%d bytes", key, len(text))
-
-            doc_id = hashlib.md5(key.encode()).hexdigest()
-            logger.debug("Generated doc_id: %s for key: %s", doc_id, key)
-            meta = {"source": "s3", "s3_key": key}
-
-            chunks = chunk_text(text)
-            logger.info(
-                "Chunking complete: doc_id=%s, total_chunks=%d", doc_id, len(chunks)
-            )
-
-            for i, chunk_text_value in enumerate(chunks):
-                logger.info(
-                    "Processing chunk %d/%d for doc_id=%s", i + 1, len(chunks), doc_id
+        if len(records) == 1:
+            process_record(records[0])
+        elif records:
+            workers = min(len(records), RECORD_CONCURRENCY)
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                # list() re-raises the first record failure, if any
+                list(
+                    ex.map(
+                        process_record,
+                        records,
+                        range(len(records)),
+                        [len(records)] * len(records),
+                    )
                 )
-                vec = embed(chunk_text_value)
-                index_chunk(doc_id, i, chunk_text_value, vec, meta)
-
-            logger.info(
-                "Successfully processed document: doc_id=%s, chunks_indexed=%d",
-                doc_id,
-                len(chunks),
-            )
 
         logger.info("Lambda invocation completed successfully")
         return {"ok": True}
@@ -1,12 +1,21 @@
 """Query processor Lambda: vector search in OpenSearch and answer via Bedrock."""
 
-import json
+import base64
+import functools
+import hashlib
 import logging
 import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
+import numpy as np
+import orjson
 from botocore.config import Config as BotoConfig
 from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
+from opensearchpy.exceptions import SerializationError
+from opensearchpy.serializer import JSONSerializer
 
 # Configure logging (buffered per invocation; see handler below)
 log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
@@ -24,11 +33,28 @@ class BufferedLogHandler(logging.Handler):
             # Avoid secondary exceptions from logging
             pass
 
+    def clear(self):
+        self._records.clear()
+
     def get_value(self):
         return "\n".join(self._records)
 
 logger = logging.getLogger(__name__)
 
+# One buffer per container, reset at the start of each invocation
+buf_handler = BufferedLogHandler()
+buf_handler.setLevel(getattr(logging, log_level, logging.INFO))
+
+def _install_log_buffer():
+    """Route root logging into buf_handler and clear the previous invocation's records."""
+    root_logger = logging.getLogger()
+    if root_logger.handlers != [buf_handler]:
+        for h in list(root_logger.handlers):
+            root_logger.removeHandler(h)
+        root_logger.addHandler(buf_handler)
+        root_logger.setLevel(getattr(logging, log_level, logging.INFO))
+    buf_handler.clear()
+
 BEDROCK_REGION = os.environ.get("BEDROCK_REGION", "us-east-1")
 OS_REGION = os.environ.get("OPENSEARCH_REGION", "us-east-1")
 EMBED_MODEL_ID = os.environ.get(
@@ -41,30 +67,99 @@ GEN_MODEL_ID = os.environ.get(
     "anthropic.claude-3-5-sonnet-20241022-v2:0",
 )
 GEN_INFERENCE_PROFILE_ID = os.environ.get("GEN_INFERENCE_PROFILE_ID")
+# Request Bedrock's latency-optimized inference for generation (only honored
+# for supported models/regions)
+GEN_LATENCY_OPTIMIZED = os.environ.get("GEN_LATENCY_OPTIMIZED", "false").lower() in ("1", "true", "yes")
 INDEX = os.environ.get("OPENSEARCH_INDEX", "kb_chunks")
 ENDPOINT = os.environ["OPENSEARCH_ENDPOINT"]
+OPENSEARCH_HOST = ENDPOINT.replace("https://", "")
+OPENSEARCH_POOL_MAXSIZE = int(os.environ.get("OPENSEARCH_POOL_MAXSIZE", "32"))
+# Optional DynamoDB table caching embeddings by content hash; shared with the
+# doc ingestor. Unset disables the cache.
+EMBED_CACHE_TABLE = os.environ.get("EMBED_CACHE_TABLE")
+# Cache entries expire (DynamoDB TTL on expires_at) after this many seconds
+EMBED_CACHE_TTL_SECONDS = int(os.environ.get("EMBED_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# Must match the doc ingestor's setting: "float" (default), "fp16" or "byte"
+VECTOR_DATA_TYPE = os.environ.get("VECTOR_DATA_TYPE", "float").lower()
+# Embedding output size; must match the index mapping. Titan v2 is asked for
+# this size (256, 512 or 1024); other models must be configured to match
+# their native size.
+EMBED_DIMENSIONS = int(os.environ.get("EMBED_DIMENSIONS", "1024"))
+# Only Titan Text Embeddings v2 accepts "dimensions"/"normalize" in the body
+EMBED_ACCEPTS_DIMENSIONS = "titan-embed-text-v2" in EMBED_MODEL_ID
+if EMBED_ACCEPTS_DIMENSIONS and EMBED_DIMENSIONS not in (256, 512, 1024):
+    raise ValueError(
+        f"EMBED_DIMENSIONS must be 256, 512 or 1024 for {EMBED_MODEL_ID}, got {EMBED_DIMENSIONS}"
+    )
+# Optional ML Commons model ID (Bedrock connector) for server-side query
+# embedding via a `neural` query; unset keeps the embed-then-kNN path
+NEURAL_MODEL_ID = os.environ.get("NEURAL_MODEL_ID")
+# In-process cache of (contexts, answer) for repeated questions on a warm
+# container; entries expire so re-ingested documents show up eventually
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL_SECONDS = int(os.environ.get("ANSWER_CACHE_TTL_SECONDS", "900"))
 
-bedrock = boto3.client(
-    "bedrock-runtime",
-    region_name=BEDROCK_REGION,
-    config=BotoConfig(
-        connect_timeout=3,
-        read_timeout=25,
-        retries={"max_attempts": 3, "mode": "standard"},
-    ),
-)
+# Clients are created on first use so CORS preflights and other early exits
+# don't pay for credential lookups and client setup on a cold start.
+@functools.lru_cache(maxsize=1)
+def _bedrock():
+    return boto3.client(
+        "bedrock-runtime",
+        region_name=BEDROCK_REGION,
+        config=BotoConfig(
+            connect_timeout=3,
+            read_timeout=25,
+            retries={"max_attempts": 3, "mode": "standard"},
+        ),
+    )
 
-session = boto3.Session(region_name=OS_REGION)
-creds = session.get_credentials()
-awsauth = AWSV4SignerAuth(creds, "aoss", region=OS_REGION)
+@functools.lru_cache(maxsize=1)
+def _dynamodb():
+    return boto3.client("dynamodb")
 
-os_client = OpenSearch(
-    hosts=[{"host": ENDPOINT.replace("https://", ""), "port": 443}],
-    http_auth=awsauth,
-    use_ssl=True,
-    verify_certs=True,
-    connection_class=RequestsHttpConnection,
-)
+@functools.lru_cache(maxsize=1)
+def _awsauth():
+    # Pass the refreshable credentials object itself (not frozen keys) so
+    # each request is signed with current credentials
+    session = boto3.Session(region_name=OS_REGION)
+    creds = session.get_credentials()
+    return AWSV4SignerAuth(creds, OS_REGION, "aoss")
+
+class OrjsonSerializer(JSONSerializer):
+    """opensearch-py serializer backed by orjson (used for search bodies and responses)."""
+
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            raise SerializationError(s, e)
+
+    def dumps(self, data):
+        if isinstance(data, str):
+            return data
+        try:
+            return orjson.dumps(
+                data, default=self.default, option=orjson.OPT_SERIALIZE_NUMPY
+            ).decode("utf-8")
+        except (TypeError, orjson.JSONEncodeError) as e:
+            raise SerializationError(data, e)
+
+@functools.lru_cache(maxsize=1)
+def _os_client():
+    return OpenSearch(
+        hosts=[{"host": OPENSEARCH_HOST, "port": 443}],
+        http_auth=_awsauth(),
+        use_ssl=True,
+        verify_certs=True,
+        connection_class=RequestsHttpConnection,
+        serializer=OrjsonSerializer(),
+        # Reuse keep-alive connections across warm invocations
+        pool_maxsize=OPENSEARCH_POOL_MAXSIZE,
+        timeout=30,
+        # gzip request bodies; vector-heavy _bulk/_search JSON compresses well
+        http_compress=True,
+    )
 
 CORS_ALLOW_ORIGIN = os.environ.get("CORS_ALLOW_ORIGIN", "*")
 CORS_HEADERS = {
@@ -80,14 +175,82 @@ def _response(status, body_obj=None, headers=None):
     return {
         "statusCode": status,
         "headers": base_headers,
-        "body": json.dumps(body_obj) if body_obj is not None else "",
+        "body": orjson.dumps(body_obj).decode() if body_obj is not None else "",
     }
 
+def _embedding_mapping():
+    """knn_vector mapping for the embedding field, per VECTOR_DATA_TYPE."""
+    if VECTOR_DATA_TYPE == "byte":
+        # int8 vectors (4x vs fp32): smaller request payloads and no on-disk
+        # rescoring, but ~4x the graph memory of the default on_disk/16x
+        # mapping, which byte vectors can't use.
+        return {
+            "type": "knn_vector",
+            "dimension": EMBED_DIMENSIONS,
+            "data_type": "byte",
+            "space_type": "cosinesimil",
+            "method": {
+                "name": "hnsw",
+                "engine": "lucene",
+                "parameters": {
+                    "m": 16,
+                    "ef_construction": 100
+                }
+            }
+        }
+    if VECTOR_DATA_TYPE == "fp16":
+        # faiss fp16 scalar quantization (2x vs fp32), fully in memory: no
+        # on-disk rescoring step, but ~8x the graph memory of the default
+        # on_disk/16x mapping. Clients keep sending plain floats.
+        return {
+            "type": "knn_vector",
+            "dimension": EMBED_DIMENSIONS,
+            "space_type": "cosinesimil",
+            "method": {
+                "name": "hnsw",
+                "engine": "faiss",
+                "parameters": {
+                    "m": 16,
+                    "ef_construction": 100,
+                    "encoder": {
+                        "name": "sq",
+                        "parameters": {"type": "fp16"}
+                    }
+                }
+            }
+        }
+    return {
+        "type": "knn_vector",
+        "dimension": EMBED_DIMENSIONS,
+        "space_type": "cosinesimil",
+        "mode": "on_disk",
+        "compression_level": "16x",
+        "method": {
+            "name": "hnsw",
+            "engine": "faiss",
+            "parameters": {
+                "m": 16,
+                "ef_construction": 100
+            }
+        }
+    }
+
+def _quantize_int8(vec):
+    """Scale unit-normalized embedding(s) into the int8 range (1-D or 2-D)."""
+    return np.clip(np.rint(np.asarray(vec, dtype=np.float32) * 127), -128, 127).astype(np.int8)
+
+# Set once the index is known to exist so warm invocations skip the probe
+_INDEX_READY = False
+
 def ensure_index_exists():
-    """Create the vector index if it doesn't exist."""
+    """Create the vector index if it doesn't exist (once per container)."""
+    global _INDEX_READY
+    if _INDEX_READY:
+        return
     try:
-        if os_client.indices.exists(index=INDEX):
+        if _os_client().indices.exists(index=INDEX):
             logger.info("Index %s already exists", INDEX)
+            _INDEX_READY = True
             return
         
         logger.info("Creating index %s", INDEX)
@@ -97,21 +260,7 @@ def ensure_index_exists():
             },
             "mappings": {
                 "properties": {
-                    "embedding": {
-                        "type": "knn_vector",
-                        "dimension": 1024,
-                        "space_type": "cosinesimil",
-                        "mode": "on_disk",
-                        "compression_level": "16x",
-                        "method": {
-                            "name": "hnsw",
-                            "engine": "faiss",
-                            "parameters": {
-                                "m": 16,
-                                "ef_construction": 100
-                            }
-                        }
-                    },
+                    "embedding": _embedding_mapping(),
                     "chunk_text": {"type": "text"},
                     "doc_id": {"type": "keyword"},
                     "chunk_id": {"type": "integer"},
@@ -128,8 +277,9 @@ def ensure_index_exists():
             }
         }
         
-        os_client.indices.create(index=INDEX, body=index_config)
+        _os_client().indices.create(index=INDEX, body=index_config)
         logger.info("Successfully created index %s", INDEX)
+        _INDEX_READY = True
         
     except Exception as e:
         logger.error("Error ensuring index exists: %s", str(e))
@@ -137,17 +287,22 @@ def ensure_index_exists():
         # fails as it might already exist or be created by another instance
 
 def embed(text):
-    """Generate an embedding for the provided text via Bedrock."""
+    """Generate a float32 embedding for the provided text via Bedrock."""
     logger.info(
-        "Generating embedding: model=%s, text_length=%d",
+        "Generating embedding: model=%s, text_length=%d, dimensions=%d",
         EMBED_MODEL_ID,
         len(text),
+        EMBED_DIMENSIONS,
     )
     try:
-        body = json.dumps({"inputText": text})
-        resp = bedrock.invoke_model(modelId=EMBED_MODEL_ID, body=body)
-        payload = json.loads(resp['body'].read())
-        embedding = payload["embedding"]
+        native_request = {"inputText": text}
+        if EMBED_ACCEPTS_DIMENSIONS:
+            native_request["dimensions"] = EMBED_DIMENSIONS
+            native_request["normalize"] = True
+        body = orjson.dumps(native_request)
+        resp = _bedrock().invoke_model(modelId=EMBED_MODEL_ID, body=body)
+        payload = orjson.loads(resp['body'].read())
+        embedding = np.asarray(payload["embedding"], dtype=np.float32)
         logger.info(
             "Successfully generated embedding: dimension=%d", len(embedding)
         )
@@ -156,6 +311,68 @@ def embed(text):
         logger.error("Embedding failed: %s - %s", type(e).__name__, str(e))
         raise
 
+def _embed_cache_key(text, model_id):
+    """Content-addressed cache key; matches the doc ingestor's key format."""
+    if EMBED_ACCEPTS_DIMENSIONS:
+        dimensions, normalize = EMBED_DIMENSIONS, True
+    else:
+        dimensions = normalize = None
+    raw = f"{model_id}\0{dimensions}\0{normalize}\0{text}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+# Cache writes run here so a miss doesn't wait on PutItem. The write overlaps
+# with search and generation; if the invocation returns first, it resumes
+# when the container is next thawed (best effort).
+_CACHE_WRITER = ThreadPoolExecutor(max_workers=1)
+
+def _cache_put(client, key, embedding):
+    try:
+        client.put_item(
+            TableName=EMBED_CACHE_TABLE,
+            Item={
+                "pk": {"S": key},
+                "vec_b64": {"S": base64.b64encode(embedding.tobytes()).decode("ascii")},
+                "dim": {"N": str(len(embedding))},
+                "expires_at": {"N": str(int(time.time()) + EMBED_CACHE_TTL_SECONDS)},
+            },
+        )
+    except Exception as e:
+        logger.warning("Embedding cache write failed: %s - %s", type(e).__name__, str(e))
+
+def embed_cached(text):
+    """Return the embedding for text, consulting the DynamoDB cache first."""
+    if not EMBED_CACHE_TABLE:
+        return embed(text)
+
+    key = _embed_cache_key(text, EMBED_MODEL_ID)
+    try:
+        resp = _dynamodb().get_item(
+            TableName=EMBED_CACHE_TABLE,
+            Key={"pk": {"S": key}},
+            ProjectionExpression="vec_b64, expires_at",
+        )
+        item = resp.get("Item")
+        # TTL deletion is lazy; treat expired items as misses
+        if item and (
+            "expires_at" not in item or int(item["expires_at"]["N"]) > time.time()
+        ):
+            logger.info("Embedding cache hit: key=%s", key)
+            return np.frombuffer(base64.b64decode(item["vec_b64"]["S"]), dtype=np.float32)
+    except Exception as e:
+        logger.warning("Embedding cache lookup failed: %s - %s", type(e).__name__, str(e))
+
+    embedding = embed(text)
+    try:
+        # Build the client on this thread; boto3 client creation isn't thread-safe
+        _CACHE_WRITER.submit(_cache_put, _dynamodb(), key, embedding)
+    except Exception as e:
+        logger.warning("Embedding cache write failed: %s - %s", type(e).__name__, str(e))
+    return embedding
+
+def _search_body(query, k):
+    # Stored vectors aren't needed in the response; leave them out of _source
+    return {"size": k, "query": query, "_source": {"excludes": ["embedding"]}}
+
 def search(vec, k=5):
     """Perform a kNN vector search in OpenSearch."""
     logger.info(
@@ -164,6 +381,9 @@ def search(vec, k=5):
         k,
         len(vec),
     )
+    if VECTOR_DATA_TYPE == "byte":
+        # Byte indexes take int8 query vectors; a quarter of the float payload
+        vec = _quantize_int8(vec)
     query = {
       "knn": {
         "embedding": {
@@ -172,7 +392,36 @@ def search(vec, k=5):
         }
       }
     }
-    res = os_client.search(index=INDEX, body={"size": k, "query": query})
+    res = _os_client().search(index=INDEX, body=_search_body(query, k))
+    return _contexts_from_response(res)
+
+def neural_search(question, k=5):
+    """Search with a `neural` query; OpenSearch embeds the text server-side.
+
+    Requires NEURAL_MODEL_ID: an ML Commons model backed by a Bedrock
+    connector producing the same embeddings (model, dimensions) as ingestion.
+    Not usable with byte indexes; retrieve_and_answer() skips it there.
+    """
+    logger.info(
+        "Neural searching OpenSearch: index=%s, k=%d, model_id=%s",
+        INDEX,
+        k,
+        NEURAL_MODEL_ID,
+    )
+    query = {
+      "neural": {
+        "embedding": {
+          "query_text": question,
+          "model_id": NEURAL_MODEL_ID,
+          "k": k
+        }
+      }
+    }
+    res = _os_client().search(index=INDEX, body=_search_body(query, k))
+    return _contexts_from_response(res)
+
+def _contexts_from_response(res):
+    """Convert an OpenSearch search response into context dicts."""
     hits = res.get("hits", {}).get("hits", [])
     total_field = res.get("hits", {}).get("total")
     total_hits = (
@@ -199,19 +448,10 @@ def search(vec, k=5):
         for h in hits
     ]
 
-def answer_with_context(question, contexts):
-    """Generate an answer using retrieved contexts via Bedrock."""
+def _generation_request(question, contexts):
+    """Build the (model_id, body) pair for an answer generation call."""
     # Use inference profile ID if available, otherwise fall back to model ID
     model_id_to_use = GEN_INFERENCE_PROFILE_ID if GEN_INFERENCE_PROFILE_ID else GEN_MODEL_ID
-    logger.info(
-        (
-            "Generating answer: model=%s, question_length=%d, "
-            "context_count=%d"
-        ),
-        model_id_to_use,
-        len(question),
-        len(contexts),
-    )
     system = (
       "You are an AWS tutor. Only answer using the provided Context. "
       "If the Context is insufficient or off-topic, say you don't know. "
@@ -231,28 +471,54 @@ def answer_with_context(question, contexts):
     # Add anthropic_version for Anthropic models
     if "anthropic" in model_id_to_use.lower():
         request_body["anthropic_version"] = "bedrock-2023-05-31"
-    body = json.dumps(request_body)
-    try:
-        # Use inference profile ID if available (required for on-demand models),
-        # otherwise use the direct model ID
-        resp = bedrock.invoke_model(modelId=model_id_to_use, body=body)
-        payload = json.loads(resp['body'].read())
-        # Parse response based on model type, guard against missing keys
-        answer = None
-        if "anthropic" in model_id_to_use.lower():
-            content = payload.get("content") or []
-            if content and isinstance(content, list) and "text" in content[0]:
-                answer = content[0]["text"]
+    return model_id_to_use, orjson.dumps(request_body)
+
+def stream_answer(question, contexts):
+    """Yield answer text deltas as Bedrock generates them."""
+    model_id_to_use, body = _generation_request(question, contexts)
+    logger.info(
+        (
+            "Streaming answer: model=%s, question_length=%d, "
+            "context_count=%d, latency_optimized=%s"
+        ),
+        model_id_to_use,
+        len(question),
+        len(contexts),
+        GEN_LATENCY_OPTIMIZED,
+    )
+    is_anthropic = "anthropic" in model_id_to_use.lower()
+    # Use inference profile ID if available (required for on-demand models),
+    # otherwise use the direct model ID
+    invoke_kwargs = {"modelId": model_id_to_use, "body": body}
+    if GEN_LATENCY_OPTIMIZED:
+        invoke_kwargs["performanceConfigLatency"] = "optimized"
+    resp = _bedrock().invoke_model_with_response_stream(**invoke_kwargs)
+    for event in resp["body"]:
+        chunk = event.get("chunk")
+        if chunk is None:
+            # Stream-level errors arrive as events keyed by the exception name
+            raise RuntimeError(f"Bedrock stream error: {orjson.dumps(event, default=str).decode()[:500]}")
+        payload = orjson.loads(chunk["bytes"])
+        # Parse delta based on model type, guard against missing keys
+        if is_anthropic:
+            if payload.get("type") == "content_block_delta":
+                text = (payload.get("delta") or {}).get("text")
+                if text:
+                    yield text
         else:
-            output = payload.get("output") or []
-            if (
-                output and isinstance(output, list)
-                and output[0].get("content")
-                and isinstance(output[0]["content"], list)
-                and output[0]["content"][0].get("text") is not None
-            ):
-                answer = output[0]["content"][0]["text"]
-        if answer is None:
+            delta = (payload.get("contentBlockDelta") or {}).get("delta") or {}
+            if delta.get("text"):
+                yield delta["text"]
+
+def answer_with_context(question, contexts):
+    """Generate an answer using retrieved contexts via Bedrock.
+
+    Consumes the response stream so decode time is not bounded by a single
+    read timeout; callers that can forward tokens should use stream_answer().
+    """
+    try:
+        answer = "".join(stream_answer(question, contexts))
+        if not answer:
             raise ValueError("Unexpected model response format")
         logger.info("Successfully generated answer: answer_length=%d", len(answer))
         return answer
@@ -260,28 +526,76 @@ def answer_with_context(question, contexts):
         logger.error("Answer generation failed: %s - %s", type(e).__name__, str(e))
         raise
 
+def retrieve_and_answer(question):
+    """Retrieve contexts for question and generate an answer from them."""
+    use_neural = bool(NEURAL_MODEL_ID)
+    if use_neural and VECTOR_DATA_TYPE == "byte":
+        # The connector returns unit-norm floats, but byte indexes hold
+        # round(x * 127) int8 vectors; embed and quantize locally instead
+        logger.warning(
+            "NEURAL_MODEL_ID is ignored with VECTOR_DATA_TYPE=byte; "
+            "falling back to embed + kNN search"
+        )
+        use_neural = False
+    if use_neural:
+        # One round-trip: OpenSearch embeds the question itself
+        contexts = neural_search(question, k=5)
+    else:
+        qvec = embed_cached(question)
+        logger.info("Question embedding generation complete")
+
+        contexts = search(qvec, k=5)
+    logger.info("Search completed: found %d contexts", len(contexts))
+
+    answer = answer_with_context(question, contexts)
+    logger.info("Answer generation complete")
+    return contexts, answer
+
+# answer cache key -> (expires_at, contexts, answer), least recently used first
+_ANSWER_CACHE = OrderedDict()
+
+def _answer_cache_key(question):
+    normalized = " ".join(question.lower().split())
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+def answer_question(question):
+    """Return (contexts, answer), served from the answer cache when enabled."""
+    if not ANSWER_CACHE_ENABLED:
+        return retrieve_and_answer(question)
+
+    key = _answer_cache_key(question)
+    now = time.monotonic()
+    entry = _ANSWER_CACHE.get(key)
+    if entry is not None:
+        expires_at, contexts, answer = entry
+        if expires_at > now:
+            _ANSWER_CACHE.move_to_end(key)
+            logger.info("Answer cache hit: key=%s", key)
+            return contexts, answer
+        del _ANSWER_CACHE[key]
+
+    contexts, answer = retrieve_and_answer(question)
+    _ANSWER_CACHE[key] = (now + ANSWER_CACHE_TTL_SECONDS, contexts, answer)
+    while len(_ANSWER_CACHE) > ANSWER_CACHE_SIZE:
+        _ANSWER_CACHE.popitem(last=False)
+    return contexts, answer
+
 def handler(event, ctx):
     """AWS Lambda handler for query answering over vector search."""
-    # Install buffered logging per invocation
-    root_logger = logging.getLogger()
-    for h in list(root_logger.handlers):
-        root_logger.removeHandler(h)
-    buf_handler = BufferedLogHandler()
-    root_logger.addHandler(buf_handler)
-    root_logger.setLevel(getattr(logging, log_level, logging.INFO))
+    _install_log_buffer()
 
     logger.info("Lambda invocation started for query processing")
 
     try:
-        # Ensure the index exists before processing queries
-        ensure_index_exists()
-
-        # Handle CORS preflight for HTTP API v2
+        # Handle CORS preflight for HTTP API v2 before touching any client
         method = (event.get("requestContext", {}).get("http", {}) or {}).get("method", "").upper()
         if method == "OPTIONS":
             return {"statusCode": 204, "headers": CORS_HEADERS, "body": ""}
 
-        body = json.loads(event.get("body") or "{}")
+        # Ensure the index exists before processing queries
+        ensure_index_exists()
+
+        body = orjson.loads(event.get("body") or "{}")
         question = body.get("question", "").strip()
         # Basic input limit to avoid excessive embedding payloads
         if len(question) > 4000:
@@ -296,14 +610,7 @@ def handler(event, ctx):
             "Query received: question='%s...' (length=%d)", question[:100], len(question)
         )
 
-        qvec = embed(question)
-        logger.info("Question embedding generation complete")
-
-        contexts = search(qvec, k=5)
-        logger.info("Search completed: found %d contexts", len(contexts))
-
-        answer = answer_with_context(question, contexts)
-        logger.info("Answer generation complete")
+        contexts, answer = answer_question(question)
 
         logger.info("Lambda invocation completed successfully")
         return _response(200, {